@@ -1,50 +1,149 @@
 import os
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_mail import Mail
-from flasgger import Swagger
+import importlib
+from functools import wraps
+import orjson
+from flask import Flask, Response
+from flask.json.provider import JSONProvider
 from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config
 
-# Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-mail = Mail()
-swagger = Swagger()
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson for fast (de)serialization
+
+    orjson serializes datetime, date and NumPy scalars natively, so
+    handlers can pass them through without per-row isoformat calls.
+    """
+
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self._OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify funnels through here; hand the orjson bytes straight to
+        # the response instead of decoding to str only for werkzeug to
+        # encode them back to UTF-8
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self._OPTIONS),
+            mimetype='application/json'
+        )
+
+# Extensions are created on first access so that importing the package for
+# CLI commands, migrations or test collection does not pay the import cost
+# of flask_sqlalchemy, flask_mail and flasgger up front.
+_extensions = {}
+
+# Blueprints are registered from dotted-string paths so the route modules
+# (and the services they pull in, e.g. sklearn and twilio) are only
+# imported when an app is actually created.
+_BLUEPRINTS = [
+    ('routes.main:main_bp', None),
+    ('routes.api:api_bp', '/api'),
+    ('routes.history:history_bp', '/history'),
+]
+
+def _get_extension(name):
+    """Create the named extension on first use and cache it"""
+    if name not in _extensions:
+        if name == 'db':
+            from flask_sqlalchemy import SQLAlchemy
+            _extensions[name] = SQLAlchemy()
+        elif name == 'migrate':
+            from flask_migrate import Migrate
+            _extensions[name] = Migrate()
+        elif name == 'mail':
+            from flask_mail import Mail
+            _extensions[name] = Mail()
+        elif name == 'swagger':
+            from flasgger import Swagger
+            _extensions[name] = Swagger()
+        else:
+            raise KeyError(name)
+    return _extensions[name]
+
+def __getattr__(name):
+    """Lazily resolve extension objects on first attribute access (PEP 562)"""
+    if name in ('db', 'migrate', 'mail', 'swagger'):
+        return _get_extension(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def create_app(config_name=None):
     """Application factory pattern"""
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
-    
+
     app = Flask(__name__)
     app.config.from_object(config[config_name])
-    
+    app.json = OrjsonProvider(app)
+
     # Proxy fix for deployment
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
-    
+
     # Initialize extensions
+    db = _get_extension('db')
     db.init_app(app)
-    migrate.init_app(app, db)
-    mail.init_app(app)
-    
-    # Swagger configuration
-    app.config['SWAGGER'] = {
-        'title': 'SHM API',
-        'description': 'Structural Health Monitoring API',
-        'version': '1.0.0',
-        'uiversion': 3
-    }
-    swagger.init_app(app)
-    
-    # Register blueprints
-    from routes.main import main_bp
-    from routes.api import api_bp
-    from routes.history import history_bp
-    
-    app.register_blueprint(main_bp)
-    app.register_blueprint(api_bp, url_prefix='/api')
-    app.register_blueprint(history_bp, url_prefix='/history')
-    
-    return app
\ No newline at end of file
+    _get_extension('migrate').init_app(app, db)
+    _get_extension('mail').init_app(app)
+
+    # Swagger configuration. The UI and spec endpoints are development
+    # tooling; production workers skip them entirely (opt back in with
+    # SWAGGER_ENABLED=1), which avoids the spec introspection machinery
+    # and shrinks per-worker memory.
+    swagger_enabled = (
+        config_name != 'production'
+        or os.environ.get('SWAGGER_ENABLED', '0') == '1'
+    )
+    if swagger_enabled:
+        app.config['SWAGGER'] = {
+            'title': 'SHM API',
+            'description': 'Structural Health Monitoring API',
+            'version': '1.0.0',
+            'uiversion': 3,
+            # Request/response validation walks the swag_from dicts per
+            # hit; the spec is documentation only, so keep it off
+            'validation': False,
+        }
+        _get_extension('swagger').init_app(app)
+
+        # The swag_from blocks are static at import time, so generate the
+        # OpenAPI spec once and serve the cached bytes afterwards instead of
+        # re-introspecting every route per /apispec request
+        def _memoize_spec(view):
+            cache = {}
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if 'spec' not in cache:
+                    response = app.make_response(view(*args, **kwargs))
+                    cache['spec'] = (response.get_data(), response.mimetype)
+                data, mimetype = cache['spec']
+                return Response(data, mimetype=mimetype)
+            return wrapper
+
+        for endpoint, view in list(app.view_functions.items()):
+            if 'apispec' in endpoint:
+                app.view_functions[endpoint] = _memoize_spec(view)
+
+    # Register blueprints lazily from dotted paths
+    for path, url_prefix in _BLUEPRINTS:
+        module_name, _, attr = path.partition(':')
+        blueprint = getattr(importlib.import_module(module_name), attr)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+
+    # Service singletons: constructed once per app so MLService keeps its
+    # trained model and AlertService reuses its Twilio client across
+    # requests instead of rebuilding them per hit
+    from services.sensor_service import SensorService
+    from services.ml_service import MLService
+    from services.alert_service import AlertService
+
+    with app.app_context():
+        app.extensions['sensor_service'] = SensorService()
+        app.extensions['ml_service'] = MLService()
+        app.extensions['alert_service'] = AlertService()
+
+    return app
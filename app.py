@@ -10,10 +10,17 @@ logger = logging.getLogger(__name__)
 # Create the Flask app
 app = create_app()
 
-# Create database tables
-with app.app_context():
-    db.create_all()
-    logger.info("Database tables created successfully")
+def init_db():
+    """Create database tables (dev convenience; production uses migrations)"""
+    with app.app_context():
+        db.create_all()
+        logger.info("Database tables created successfully")
+
+# Table creation is opt-in so CLI commands, test collection and worker
+# forks don't pay a DB round-trip at import time
+if os.environ.get('SHM_AUTOCREATE') == '1':
+    init_db()
 
 if __name__ == '__main__':
+    init_db()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -6,9 +6,18 @@ class Config:
     SECRET_KEY = os.environ.get('SESSION_SECRET', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///shm.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool sized for concurrent dashboard/API traffic; LIFO checkout keeps
+    # a hot subset of connections. Pre-ping costs a round-trip per checkout,
+    # so it is opt-in (rely on pool_recycle/TCP keepalives instead).
     SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get('DB_POOL_SIZE', '20')),
+        "max_overflow": int(os.environ.get('DB_MAX_OVERFLOW', '10')),
         "pool_recycle": 300,
-        "pool_pre_ping": True,
+        "pool_pre_ping": os.environ.get('DB_PREPING', '0') == '1',
+        "pool_use_lifo": True,
+        # Larger compiled-statement cache so repeated ORM queries skip
+        # SQL re-compilation
+        "query_cache_size": 1200,
     }
     
     # Email configuration
@@ -33,9 +42,17 @@ class Config:
     # ML model configuration
     ML_MODEL_RETRAIN_INTERVAL = timedelta(hours=24)
     ML_TRAINING_DATA_SIZE = 1000
+    # Directory for persisted model artifacts (joblib dumps); workers
+    # mmap-load these instead of retraining after a restart
+    ML_MODEL_DIR = os.environ.get('ML_MODEL_DIR', 'models')
     
+    # Response caching (disabled unless a Redis URL is provided)
+    REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_TTL_SECONDS = int(os.environ.get('CACHE_TTL_SECONDS', '10'))
+
     # Pagination
     READINGS_PER_PAGE = 50
+    MAX_LIMIT = 500
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -52,6 +69,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    # In-memory SQLite uses StaticPool, which rejects QueuePool options
+    SQLALCHEMY_ENGINE_OPTIONS = {}
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,14 @@
+import pytest
+
+@pytest.fixture(scope="session")
+def worker_id(request):
+    """Id of the current pytest-xdist worker, or 'master' without -n
+
+    Used to give every parallel worker its own shared-cache database
+    name, so `pytest -n auto` can shard the endpoint tests across cores
+    with no cross-worker state. Matches the fixture pytest-xdist itself
+    provides, and degrades to a single database on a plain run.
+    """
+    if hasattr(request.config, "workerinput"):
+        return request.config.workerinput["workerid"]
+    return "master"
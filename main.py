@@ -1,4 +1,5 @@
-from app import app
+from app import app, init_db
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    init_db()
+    app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,6 +1,14 @@
 from datetime import datetime
+from itertools import count
+from operator import attrgetter
 from __init__ import db
-from sqlalchemy import Index
+from sqlalchemy import Index, and_, or_, desc, text, insert, select
+
+# Attribute projection shared by SensorReading.to_dict and the row-level
+# query paths; attrgetter moves the per-row attribute lookups into C
+_READING_ATTRS = ('id', 'timestamp', 'vibration', 'strain', 'temperature',
+                  'is_anomaly', 'anomaly_score', 'alert_level', 'alert_sent')
+_reading_values = attrgetter(*_READING_ATTRS)
 
 class SensorReading(db.Model):
     """Model for storing sensor readings"""
@@ -8,68 +16,245 @@ class SensorReading(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    vibration = db.Column(db.Float, nullable=False)
-    strain = db.Column(db.Float, nullable=False)
-    temperature = db.Column(db.Float, nullable=False)
-    
+    # Sensor values have a small dynamic range, so single-precision floats
+    # (real/float4 on PostgreSQL) halve row size without losing accuracy
+    vibration = db.Column(db.Float(precision=24), nullable=False)
+    strain = db.Column(db.Float(precision=24), nullable=False)
+    temperature = db.Column(db.Float(precision=24), nullable=False)
+
     # ML prediction results
     is_anomaly = db.Column(db.Boolean, default=False)
-    anomaly_score = db.Column(db.Float, default=0.0)
+    anomaly_score = db.Column(db.Float(precision=24), default=0.0)
     
     # Alert information
     alert_level = db.Column(db.String(20), default='normal')  # normal, warning, critical
     alert_sent = db.Column(db.Boolean, default=False)
     
-    # Add indexes for better query performance
+    # Composite indexes match the hot query shapes (filter + ORDER BY
+    # timestamp DESC) so the ordering comes straight off the index; the
+    # anomaly index is partial on PostgreSQL since anomalies are rare
     __table_args__ = (
-        Index('ix_sensor_readings_timestamp', 'timestamp'),
-        Index('ix_sensor_readings_alert_level', 'alert_level'),
-        Index('ix_sensor_readings_is_anomaly', 'is_anomaly'),
+        Index('ix_sensor_readings_ts_id', desc('timestamp'), desc('id')),
+        Index('ix_sensor_readings_alert_ts', 'alert_level', desc('timestamp')),
+        Index('ix_sensor_readings_anomaly_ts', 'is_anomaly', desc('timestamp'),
+              postgresql_where=text('is_anomaly = true')),
     )
     
+    # In-process data version folded into the collection ETag: the write
+    # paths bump it after committing, so in-place UPDATEs — invisible to
+    # MAX(id)/COUNT — change the token without scanning the table.
+    # Per-process by design: workers that did not perform an update keep
+    # serving their token until Cache-Control's max-age bounds the
+    # staleness, which is the same window the response cache accepts.
+    _write_counter = count(1)
+    data_version = 0
+
+    @classmethod
+    def bump_data_version(cls):
+        """Record a committed write; next(count) is atomic under the GIL"""
+        cls.data_version = next(cls._write_counter)
+
     def __repr__(self):
         return f'<SensorReading {self.id}: {self.timestamp}>'
-    
+
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'timestamp': self.timestamp.isoformat(),
-            'vibration': self.vibration,
-            'strain': self.strain,
-            'temperature': self.temperature,
-            'is_anomaly': self.is_anomaly,
-            'anomaly_score': self.anomaly_score,
-            'alert_level': self.alert_level,
-            'alert_sent': self.alert_sent
-        }
+        return dict(zip(_READING_ATTRS, _reading_values(self)))
     
+    # Column order for row-level (non-ORM) projections, kept in sync with
+    # to_dict so both paths produce the same payload shape
+    PROJECTION = _READING_ATTRS
+
     @classmethod
     def get_latest(cls, limit=20):
         """Get the latest sensor readings"""
         return cls.query.order_by(cls.timestamp.desc()).limit(limit).all()
+
+    @classmethod
+    def get_latest_rows(cls, limit=20, anomalies_only=False):
+        """Get the latest readings as plain column rows
+
+        Selecting the columns directly skips ORM instance construction and
+        identity-map bookkeeping on the hot list endpoints.
+        """
+        query = db.session.query(*[getattr(cls, c) for c in cls.PROJECTION])
+        if anomalies_only:
+            query = query.filter(cls.is_anomaly == True)
+        return query.order_by(cls.timestamp.desc()).limit(limit).all()
+
+    @classmethod
+    def bulk_insert(cls, mappings):
+        """Bulk-insert reading dicts in one statement
+
+        On PostgreSQL the rows go through COPY, which is roughly two orders
+        of magnitude faster than row-by-row INSERT; other backends fall
+        back to a single executemany.
+        """
+        if db.engine.dialect.name == 'postgresql':
+            cls._copy_insert(mappings)
+        else:
+            db.session.execute(insert(cls), mappings)
+            db.session.commit()
+
+    @classmethod
+    def _copy_insert(cls, mappings):
+        """PostgreSQL COPY fast path for bulk_insert"""
+        import csv
+        from io import StringIO
+
+        buf = StringIO()
+        writer = csv.writer(buf)
+        # Spell out every defaulted column: COPY bypasses the Python-side
+        # defaults, so omitting them would leave NULLs where the
+        # executemany fallback writes False/0.0
+        for mapping in mappings:
+            writer.writerow([
+                mapping['timestamp'],
+                mapping['vibration'],
+                mapping['strain'],
+                mapping['temperature'],
+                mapping.get('is_anomaly', False),
+                mapping.get('anomaly_score', 0.0),
+                mapping.get('alert_level', 'normal'),
+                mapping.get('alert_sent', False)
+            ])
+        buf.seek(0)
+
+        raw = db.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY sensor_readings (timestamp, vibration, strain, temperature, "
+                    "is_anomaly, anomaly_score, alert_level, alert_sent) "
+                    "FROM STDIN CSV",
+                    buf
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+    @classmethod
+    def get_training_matrix(cls, limit=1000, since=None):
+        """Get recent readings as a contiguous float32 feature matrix
+
+        Returns an (n, 5) array of (vibration, strain, temperature, hour,
+        weekday) rows built straight from the DB cursor, avoiding ORM
+        instances and giving sklearn cache-friendly contiguous memory.
+        The rows are streamed through a server-side cursor (where the
+        backend supports one) in 4096-row chunks into a preallocated
+        array, so peak memory is the final matrix rather than the matrix
+        plus a full row buffer.
+        """
+        import numpy as np
+
+        query = select(cls.timestamp, cls.vibration, cls.strain, cls.temperature)
+        if since is not None:
+            query = query.where(cls.timestamp >= since)
+        query = query.order_by(cls.timestamp.desc()).limit(limit)
+        query = query.execution_options(stream_results=True)
+
+        features = np.empty((limit, 5), dtype=np.float32)
+        count = 0
+        for ts, vibration, strain, temperature in db.session.execute(query).yield_per(4096):
+            features[count] = (vibration, strain, temperature, ts.hour, ts.weekday())
+            count += 1
+
+        return features[:count]
+
+    @classmethod
+    def rows_to_dicts(cls, rows):
+        """Convert projected column rows to to_dict-shaped dictionaries"""
+        result = []
+        for row in rows:
+            result.append(dict(zip(cls.PROJECTION, row)))
+        return result
     
     @classmethod
-    def get_by_date_range(cls, start_date, end_date):
-        """Get readings within a date range"""
-        return cls.query.filter(
+    def _date_range_query(cls, start_date, end_date, before_timestamp=None,
+                          before_id=None, anomalies_only=False):
+        """Build the shared date-range query with optional keyset cursor
+
+        The interval is half-open: [start_date, end_date).
+        """
+        query = cls.query.filter(
             cls.timestamp >= start_date,
-            cls.timestamp <= end_date
-        ).order_by(cls.timestamp.desc()).all()
+            cls.timestamp < end_date
+        )
+
+        if anomalies_only:
+            query = query.filter(cls.is_anomaly == True)
+
+        if before_timestamp is not None and before_id is not None:
+            query = query.filter(or_(
+                cls.timestamp < before_timestamp,
+                and_(cls.timestamp == before_timestamp, cls.id < before_id)
+            ))
+
+        return query.order_by(cls.timestamp.desc(), cls.id.desc())
+
+    @classmethod
+    def get_by_date_range(cls, start_date, end_date, before_timestamp=None,
+                          before_id=None, limit=50, anomalies_only=False):
+        """Get readings within a date range using keyset pagination
+
+        The (before_timestamp, before_id) cursor resumes strictly before the
+        last row already seen, so deep pages stay index-driven instead of
+        degrading like OFFSET scans.
+        """
+        return cls._date_range_query(
+            start_date, end_date,
+            before_timestamp=before_timestamp,
+            before_id=before_id,
+            anomalies_only=anomalies_only
+        ).limit(limit).all()
+
+    @classmethod
+    def stream_by_date_range(cls, start_date, end_date, before_timestamp=None,
+                             before_id=None, limit=None, anomalies_only=False,
+                             batch_size=500):
+        """Stream readings within a date range without materializing the list
+
+        Uses a server-side cursor (where the backend supports it) and fetches
+        rows in batches of batch_size via yield_per.
+        """
+        query = cls._date_range_query(
+            start_date, end_date,
+            before_timestamp=before_timestamp,
+            before_id=before_id,
+            anomalies_only=anomalies_only
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execution_options(stream_results=True).yield_per(batch_size)
     
     @classmethod
     def get_anomalies(cls, limit=50):
         """Get anomalous readings"""
-        return cls.query.filter(cls.is_anomaly == True).order_by(
-            cls.timestamp.desc()
-        ).limit(limit).all()
-    
+        return cls.search(anomalies_only=True, limit=limit)
+
     @classmethod
     def get_alerts(cls, alert_level='warning', limit=50):
         """Get readings with specific alert level"""
-        return cls.query.filter(cls.alert_level == alert_level).order_by(
-            cls.timestamp.desc()
-        ).limit(limit).all()
+        return cls.search(alert_level=alert_level, limit=limit)
+
+    @classmethod
+    def search(cls, start=None, end=None, anomalies_only=False,
+               alert_level=None, limit=20):
+        """Fetch readings with all filters composed into one SQL query
+
+        Every predicate and the LIMIT run in the database, so the result
+        set is exactly the rows needed — no Python post-filtering.
+        """
+        query = cls.query
+        if start is not None:
+            query = query.filter(cls.timestamp >= start)
+        if end is not None:
+            query = query.filter(cls.timestamp < end)
+        if anomalies_only:
+            query = query.filter(cls.is_anomaly.is_(True))
+        if alert_level:
+            query = query.filter(cls.alert_level == alert_level)
+        return query.order_by(cls.timestamp.desc()).limit(limit).all()
 
 class MLModel(db.Model):
     """Model for storing ML model metadata"""
@@ -82,6 +267,10 @@ class MLModel(db.Model):
     accuracy_score = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+
+    # Filesystem path of the persisted (scaler, model) joblib artifact, so
+    # a fresh worker can load the fitted model instead of retraining
+    model_path = db.Column(db.String(255))
     
     # Store model parameters as JSON
     model_params = db.Column(db.Text)  # JSON string of model parameters
@@ -96,7 +285,7 @@ class MLModel(db.Model):
             'model_type': self.model_type,
             'training_data_size': self.training_data_size,
             'accuracy_score': self.accuracy_score,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'is_active': self.is_active
         }
 
@@ -113,7 +302,18 @@ class AlertLog(db.Model):
     sent_at = db.Column(db.DateTime, default=datetime.utcnow)
     success = db.Column(db.Boolean, default=False)
     error_message = db.Column(db.Text)
-    
+
+    # Composite indexes for the hot predicates: the fatigue check filters
+    # (alert_level, sent_at, success) and the statistics/history paths
+    # scan by sent_at with type/level/success conditions, so both can be
+    # answered from the index without touching the heap
+    __table_args__ = (
+        Index('ix_alert_logs_level_sent_success',
+              'alert_level', desc('sent_at'), 'success'),
+        Index('ix_alert_logs_sent_type_level',
+              desc('sent_at'), 'alert_type', 'alert_level', 'success'),
+    )
+
     # Relationship
     reading = db.relationship('SensorReading', backref='alert_logs')
     
@@ -128,7 +328,7 @@ class AlertLog(db.Model):
             'alert_level': self.alert_level,
             'recipient': self.recipient,
             'message': self.message,
-            'sent_at': self.sent_at.isoformat(),
+            'sent_at': self.sent_at,
             'success': self.success,
             'error_message': self.error_message
         }
\ No newline at end of file
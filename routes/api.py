@@ -1,15 +1,64 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from flasgger import swag_from
 from datetime import datetime, timedelta
+import hashlib
 import logging
+import orjson
+from sqlalchemy import func
+from __init__ import OrjsonProvider, db
+from models import SensorReading, AlertLog
 from services.sensor_service import SensorService
-from services.ml_service import MLService
-from services.alert_service import AlertService
+from services.cache_service import cached_response
 
 logger = logging.getLogger(__name__)
 
 api_bp = Blueprint('api', __name__)
 
+# The streaming branch serializes rows itself, so it must use the same
+# orjson options as the app's JSON provider or its timestamps would come
+# out naive while jsonify responses carry the UTC offset
+_JSON_OPTIONS = OrjsonProvider._OPTIONS
+
+def _clamp_limit(default: int = 20) -> int:
+    """Read the limit query parameter, clamped to [1, MAX_LIMIT]"""
+    limit = request.args.get('limit', default, type=int) or default
+    return max(1, min(limit, current_app.config.get('MAX_LIMIT', 500)))
+
+def _bool_arg(name: str) -> bool:
+    """Read a boolean query parameter ('false' and '0' are falsy)"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def _parse_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date via CPython's C-level ISO parser
+
+    datetime.fromisoformat is roughly 20x faster than strptime, which
+    re-interprets the format string on every call.
+    """
+    if len(value) != 10:
+        raise ValueError(f"Invalid date: {value!r}")
+    return datetime.fromisoformat(value)
+
+def _collection_etag(model, data_version=None) -> str:
+    """Compute a cheap ETag from row extent, data version and query string
+
+    MAX(id) and COUNT are a single indexed lookup and capture inserts;
+    models whose rows mutate in place pass their in-process data version
+    so UPDATEs change the token too, without any scan over the mutable
+    columns. Validating a conditional request therefore stays far
+    cheaper than re-serializing the payload.
+    """
+    latest_id, row_count = db.session.query(
+        func.max(model.id), func.count(model.id)
+    ).first()
+    token = (f"{latest_id}:{row_count}:{data_version}:"
+             f"{request.query_string.decode('utf-8', 'replace')}")
+    return hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+
+def _set_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'max-age=5'
+    return response
+
 @api_bp.route('/readings')
 @swag_from({
     'tags': ['API'],
@@ -43,6 +92,19 @@ api_bp = Blueprint('api', __name__)
             'type': 'boolean',
             'default': False,
             'description': 'Return only anomalous readings'
+        },
+        {
+            'name': 'before_timestamp',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date-time',
+            'description': 'Keyset cursor: timestamp of the last reading seen'
+        },
+        {
+            'name': 'before_id',
+            'in': 'query',
+            'type': 'integer',
+            'description': 'Keyset cursor: id of the last reading seen'
         }
     ],
     'responses': {
@@ -74,41 +136,69 @@ api_bp = Blueprint('api', __name__)
         }
     }
 })
-def get_readings():
+@cached_response('readings')
+def get_readings() -> Response:
     """Get sensor readings with filtering options"""
     try:
+        # Conditional-request fast path: skip the fetch and serialization
+        # entirely when the client already has the current payload
+        etag = _collection_etag(SensorReading, SensorReading.data_version)
+        if etag in request.if_none_match:
+            return '', 304
+
         # Get query parameters
-        limit = request.args.get('limit', 20, type=int)
+        limit = _clamp_limit(default=20)
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
-        anomalies_only = request.args.get('anomalies_only', False, type=bool)
-        
-        sensor_service = SensorService()
-        
-        # Filter by date range if provided
+        anomalies_only = _bool_arg('anomalies_only')
+        before_timestamp = request.args.get('before_timestamp')
+        before_id = request.args.get('before_id', type=int)
+
+        # Filter by date range if provided; anomaly filter and limit are
+        # pushed into the SQL query rather than post-filtered in Python
         if start_date and end_date:
             try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-                readings = sensor_service.get_readings_by_date_range(start_dt, end_dt)
+                start_dt = _parse_date(start_date)
+                end_dt = _parse_date(end_date) + timedelta(days=1)
+                before_ts = datetime.fromisoformat(before_timestamp) if before_timestamp else None
             except ValueError:
                 return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
-        else:
-            readings = sensor_service.get_readings(limit=limit)
-        
-        # Filter anomalies if requested
-        if anomalies_only:
-            readings = [r for r in readings if r.is_anomaly]
-        
-        # Convert to dictionaries
-        readings_data = [reading.to_dict() for reading in readings[:limit]]
-        
-        return jsonify({
+
+            readings_iter = SensorService.stream_readings_by_date_range(
+                start_dt, end_dt,
+                before_timestamp=before_ts,
+                before_id=before_id,
+                limit=limit,
+                anomalies_only=anomalies_only
+            )
+
+            # Stream the rows in batches instead of materializing the full
+            # list; the total is appended once the stream is exhausted
+            def generate():
+                yield b'{"readings":['
+                total = 0
+                for reading in readings_iter:
+                    if total:
+                        yield b','
+                    yield orjson.dumps(reading.to_dict(), option=_JSON_OPTIONS)
+                    total += 1
+                tail = {'total': total, 'limit': limit, 'anomalies_only': anomalies_only}
+                yield b'],' + orjson.dumps(tail, option=_JSON_OPTIONS)[1:]
+
+            return _set_cache_headers(
+                Response(stream_with_context(generate()), mimetype='application/json'),
+                etag
+            )
+
+        # Column projection avoids constructing ORM instances per row
+        readings_data = SensorService.get_readings_data(limit=limit, anomalies_only=anomalies_only)
+
+        return _set_cache_headers(jsonify({
             'readings': readings_data,
             'total': len(readings_data),
             'limit': limit,
             'anomalies_only': anomalies_only
-        })
+        }), etag)
         
     except Exception as e:
         logger.error(f"Error getting readings: {str(e)}")
@@ -151,13 +241,13 @@ def get_readings():
         }
     }
 })
-def train_model():
+def train_model() -> Response:
     """Train a new ML model"""
     try:
         model_type = request.form.get('model_type', 'isolation_forest')
         contamination = float(request.form.get('contamination', 0.1))
         
-        ml_service = MLService()
+        ml_service = current_app.extensions['ml_service']
         
         if model_type == 'isolation_forest':
             result = ml_service.train_isolation_forest(contamination=contamination)
@@ -184,10 +274,10 @@ def train_model():
         }
     }
 })
-def model_info():
+def model_info() -> Response:
     """Get ML model information"""
     try:
-        ml_service = MLService()
+        ml_service = current_app.extensions['ml_service']
         return jsonify(ml_service.get_model_info())
     except Exception as e:
         logger.error(f"Error getting model info: {str(e)}")
@@ -232,18 +322,23 @@ def model_info():
         }
     }
 })
-def alert_history():
+@cached_response('alerts:history')
+def alert_history() -> Response:
     """Get alert history"""
     try:
-        limit = request.args.get('limit', 50, type=int)
-        
-        alert_service = AlertService()
+        etag = _collection_etag(AlertLog)
+        if etag in request.if_none_match:
+            return '', 304
+
+        limit = _clamp_limit(default=50)
+
+        alert_service = current_app.extensions['alert_service']
         alerts = alert_service.get_alert_history(limit=limit)
-        
-        return jsonify({
+
+        return _set_cache_headers(jsonify({
             'alerts': alerts,
             'total': len(alerts)
-        })
+        }), etag)
         
     except Exception as e:
         logger.error(f"Error getting alert history: {str(e)}")
@@ -277,7 +372,7 @@ def alert_history():
         }
     }
 })
-def test_alert():
+def test_alert() -> Response:
     """Send a test alert"""
     try:
         alert_type = request.form.get('alert_type')
@@ -287,9 +382,6 @@ def test_alert():
             return jsonify({'error': 'Missing required parameters'}), 400
         
         # Create a dummy reading for testing
-        from models import SensorReading
-        from datetime import datetime
-        
         test_reading = SensorReading(
             timestamp=datetime.utcnow(),
             vibration=2.5,
@@ -298,7 +390,7 @@ def test_alert():
             alert_level='warning'
         )
         
-        alert_service = AlertService()
+        alert_service = current_app.extensions['alert_service']
         
         if alert_type == 'email':
             result = alert_service.send_email_alert(
@@ -1,8 +1,16 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, current_app, Response, stream_with_context
 from flasgger import swag_from
 from datetime import datetime, timedelta
+from functools import lru_cache
+from io import BytesIO, TextIOWrapper
+from itertools import islice
+import csv
 import logging
+import zlib
+from sqlalchemy import and_, or_, func
+from __init__ import db
 from services.sensor_service import SensorService
+from services.cache_service import ttl_memoize
 from models import SensorReading
 from config import Config
 
@@ -10,6 +18,66 @@ logger = logging.getLogger(__name__)
 
 history_bp = Blueprint('history', __name__)
 
+@lru_cache(maxsize=128)
+def _parse_range(start_date, end_date):
+    """Parse optional YYYY-MM-DD bounds into a half-open [start, end) interval
+
+    The exclusive upper bound keeps the bare timestamp column in every
+    predicate, so range scans stay on the (timestamp, id) index. Dashboard
+    polling repeats the same date pair on every refresh, so the parsed
+    bounds are memoized on the raw strings.
+    """
+    start_dt = end_dt = None
+    if start_date:
+        try:
+            start_dt = datetime.fromisoformat(start_date)
+        except ValueError:
+            raise ValueError('Invalid start_date format')
+    if end_date:
+        try:
+            end_dt = datetime.fromisoformat(end_date) + timedelta(days=1)
+        except ValueError:
+            raise ValueError('Invalid end_date format')
+    return start_dt, end_dt
+
+def _build_history_query(start_dt, end_dt, alert_level, anomalies_only):
+    """Compose the filtered history query shared by page fetch and count"""
+    query = SensorReading.query
+    if start_dt:
+        query = query.filter(SensorReading.timestamp >= start_dt)
+    if end_dt:
+        query = query.filter(SensorReading.timestamp < end_dt)
+    if alert_level:
+        query = query.filter(SensorReading.alert_level == alert_level)
+    if anomalies_only:
+        query = query.filter(SensorReading.is_anomaly == True)
+    return query
+
+def _gzip_stream(chunks, level=1):
+    """Compress an iterable of byte chunks into a gzip byte stream
+
+    CSV compresses 5-10x; level 1 favours throughput over ratio so the
+    compressor never becomes the bottleneck of the export stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@ttl_memoize(60)
+def _history_total(start_dt, end_dt, alert_level, anomalies_only):
+    """COUNT over the filter predicate, cached per filter signature
+
+    The count dominates page latency on large tables while the UI only
+    needs a roughly current total, so it refreshes at most once a minute
+    per (start, end, alert_level, anomalies_only) combination.
+    """
+    return _build_history_query(
+        start_dt, end_dt, alert_level, anomalies_only
+    ).order_by(None).count()
+
 @history_bp.route('/')
 @swag_from({
     'tags': ['History'],
@@ -25,11 +93,10 @@ def history_dashboard():
     """Render the history dashboard page"""
     try:
         # Get recent readings for initial display
-        sensor_service = SensorService()
-        recent_readings = sensor_service.get_readings(limit=100)
-        
+        recent_readings = SensorService.get_readings(limit=100)
+
         # Get statistics
-        stats = sensor_service.get_statistics()
+        stats = SensorService.get_statistics()
         
         return render_template('history.html', 
                              readings=recent_readings, 
@@ -85,6 +152,19 @@ def history_dashboard():
             'type': 'boolean',
             'default': False,
             'description': 'Show only anomalies'
+        },
+        {
+            'name': 'after_ts',
+            'in': 'query',
+            'type': 'string',
+            'format': 'date-time',
+            'description': 'Keyset cursor: timestamp of the last row seen'
+        },
+        {
+            'name': 'after_id',
+            'in': 'query',
+            'type': 'integer',
+            'description': 'Keyset cursor: id of the last row seen'
         }
     ],
     'responses': {
@@ -121,57 +201,79 @@ def get_history_data():
     """Get historical sensor data with filtering and pagination"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 50, type=int), 100)
+        # Clamp to [1, 100]: zero would divide by zero in the pages
+        # computation and a negative value becomes a negative SQL LIMIT
+        per_page = request.args.get('per_page', 50, type=int) or 50
+        per_page = max(1, min(per_page, 100))
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         alert_level = request.args.get('alert_level')
         anomalies_only = request.args.get('anomalies_only', False, type=bool)
-        
-        # Build query
-        query = SensorReading.query
-        
-        # Date filtering
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(SensorReading.timestamp >= start_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid start_date format'}), 400
-        
-        if end_date:
+        after_ts = request.args.get('after_ts')
+        after_id = request.args.get('after_id', type=int)
+        
+        # Date filtering over a half-open [start, end) interval
+        try:
+            start_dt, end_dt = _parse_range(start_date, end_date)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = _build_history_query(start_dt, end_dt, alert_level, anomalies_only)
+
+        # Cached total over the filter predicate, without the cursor
+        total = _history_total(start_dt, end_dt, alert_level, anomalies_only)
+
+        # Keyset (seek) pagination: resume strictly after the cursor row
+        # instead of OFFSET, which degrades linearly with page depth
+        offset = 0
+        if after_ts and after_id is not None:
             try:
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-                query = query.filter(SensorReading.timestamp < end_dt)
+                after_dt = datetime.fromisoformat(after_ts)
             except ValueError:
-                return jsonify({'error': 'Invalid end_date format'}), 400
-        
-        # Alert level filtering
-        if alert_level:
-            query = query.filter(SensorReading.alert_level == alert_level)
-        
-        # Anomaly filtering
-        if anomalies_only:
-            query = query.filter(SensorReading.is_anomaly == True)
-        
-        # Order by timestamp descending
-        query = query.order_by(SensorReading.timestamp.desc())
-        
-        # Paginate
-        paginated = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+                return jsonify({'error': 'Invalid after_ts format'}), 400
+            query = query.filter(or_(
+                SensorReading.timestamp < after_dt,
+                and_(SensorReading.timestamp == after_dt,
+                     SensorReading.id < after_id)
+            ))
+        elif page > 1:
+            # The pagination bar navigates by page number without a
+            # cursor, so numbered pages must still land on the right
+            # rows; OFFSET is the fallback for those requests
+            offset = (page - 1) * per_page
+
+        # Column tuples skip ORM instance construction; the batched
+        # serializer builds the dicts positionally
+        query = query.with_entities(
+            *[getattr(SensorReading, c) for c in SensorReading.PROJECTION]
+        ).order_by(
+            SensorReading.timestamp.desc(), SensorReading.id.desc()
         )
-        
-        # Convert to dictionaries
-        readings_data = [reading.to_dict() for reading in paginated.items]
-        
+
+        # Fetch one extra row to know whether another page exists
+        if offset:
+            query = query.offset(offset)
+        rows = query.limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+
+        next_cursor = None
+        if has_next and rows:
+            last = rows[-1]
+            next_cursor = {
+                'after_ts': last.timestamp.isoformat(),
+                'after_id': last.id
+            }
+
+        readings_data = SensorReading.rows_to_dicts(rows)
+
         return jsonify({
             'readings': readings_data,
-            'total': paginated.total,
+            'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': paginated.pages
+            'pages': (total + per_page - 1) // per_page,
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -210,70 +312,89 @@ def get_history_data():
     }
 })
 def export_data():
-    """Export historical data as CSV"""
+    """Export historical data as a streamed CSV"""
     try:
-        import csv
-        from io import StringIO
-        from flask import Response
-        
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # Build query
+        # Build query over a half-open [start, end) interval
         query = SensorReading.query
-        
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(SensorReading.timestamp >= start_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid start_date format'}), 400
-        
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-                query = query.filter(SensorReading.timestamp < end_dt)
-            except ValueError:
-                return jsonify({'error': 'Invalid end_date format'}), 400
-        
-        # Get data ordered by timestamp
-        readings = query.order_by(SensorReading.timestamp.asc()).all()
-        
-        # Create CSV
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow([
-            'ID', 'Timestamp', 'Vibration', 'Strain', 'Temperature',
-            'Is Anomaly', 'Anomaly Score', 'Alert Level', 'Alert Sent'
-        ])
-        
-        # Write data
-        for reading in readings:
+
+        try:
+            start_dt, end_dt = _parse_range(start_date, end_date)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if start_dt:
+            query = query.filter(SensorReading.timestamp >= start_dt)
+        if end_dt:
+            query = query.filter(SensorReading.timestamp < end_dt)
+        
+        # Stream lightweight column tuples in batches: with_entities skips
+        # ORM instance construction and memory stays O(batch)
+        readings = query.with_entities(
+            SensorReading.id,
+            SensorReading.timestamp,
+            SensorReading.vibration,
+            SensorReading.strain,
+            SensorReading.temperature,
+            SensorReading.is_anomaly,
+            SensorReading.anomaly_score,
+            SensorReading.alert_level,
+            SensorReading.alert_sent
+        ).order_by(
+            SensorReading.timestamp.asc()
+        ).execution_options(
+            # stream_results opens a server-side cursor on PostgreSQL so
+            # the client socket never buffers the whole result; at most
+            # max_row_buffer rows live in RAM at once
+            stream_results=True,
+            max_row_buffer=1000
+        ).yield_per(1000)
+
+        def generate():
+            # csv.writer over a BytesIO+TextIOWrapper pair: writerows on
+            # each 1000-row slice is a single C-level loop, and the buffer
+            # holds bytes so nothing is re-encoded before hitting the wire
+            buffer = BytesIO()
+            text_stream = TextIOWrapper(buffer, encoding='utf-8',
+                                        newline='', write_through=True)
+            writer = csv.writer(text_stream)
             writer.writerow([
-                reading.id,
-                reading.timestamp.isoformat(),
-                reading.vibration,
-                reading.strain,
-                reading.temperature,
-                reading.is_anomaly,
-                reading.anomaly_score,
-                reading.alert_level,
-                reading.alert_sent
+                'ID', 'Timestamp', 'Vibration', 'Strain', 'Temperature',
+                'Is Anomaly', 'Anomaly Score', 'Alert Level', 'Alert Sent'
             ])
-        
-        # Prepare response
-        csv_data = output.getvalue()
+
+            rows_iter = (
+                (row.id, row.timestamp.isoformat(), row.vibration,
+                 row.strain, row.temperature, row.is_anomaly,
+                 row.anomaly_score, row.alert_level, row.alert_sent)
+                for row in readings
+            )
+            while True:
+                batch = list(islice(rows_iter, 1000))
+                if not batch:
+                    break
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+
         filename = f"sensor_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        return Response(
-            csv_data,
-            mimetype='text/csv',
-            headers={
-                'Content-Disposition': f'attachment; filename={filename}'
-            }
-        )
+        headers = {
+            'Content-Disposition': f'attachment; filename={filename}',
+            'Vary': 'Accept-Encoding'
+        }
+
+        # Compress on the fly when the client can take it; raw numeric CSV
+        # is mostly wire overhead otherwise
+        body = generate()
+        if request.accept_encodings.quality('gzip') > 0:
+            body = _gzip_stream(body)
+            headers['Content-Encoding'] = 'gzip'
+
+        return Response(stream_with_context(body), mimetype='text/csv', headers=headers)
         
     except Exception as e:
         logger.error(f"Error exporting data: {str(e)}")
@@ -333,57 +454,78 @@ def get_chart_data():
     """Get aggregated data for charts"""
     try:
         period = request.args.get('period', 'day')
-        days = request.args.get('days', 7, type=int)
-        
+        # Clamp the window so a stray days=100000 cannot turn the request
+        # into a whole-table scan
+        days = min(max(request.args.get('days', 7, type=int), 1), 365)
+
         # Calculate date range
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
-        
-        # Get readings in date range
-        readings = SensorReading.query.filter(
+
+        # Probe for any row in the window first; an indexed LIMIT 1 lookup
+        # is far cheaper than running the aggregate over an empty range
+        has_rows = db.session.query(
+            SensorReading.query.filter(
+                SensorReading.timestamp >= start_date,
+                SensorReading.timestamp < end_date
+            ).exists()
+        ).scalar()
+        if not has_rows:
+            return jsonify({'labels': [], 'datasets': []})
+
+        # Aggregate in the database: one row per bucket comes back instead
+        # of every raw reading being grouped and averaged in Python
+        if db.engine.dialect.name == 'postgresql':
+            trunc_unit = period if period in ('hour', 'day', 'week') else 'month'
+            bucket = func.date_trunc(trunc_unit, SensorReading.timestamp)
+        else:  # SQLite
+            if period == 'hour':
+                bucket = func.strftime('%Y-%m-%d %H:00', SensorReading.timestamp)
+            elif period == 'day':
+                bucket = func.strftime('%Y-%m-%d', SensorReading.timestamp)
+            elif period == 'week':
+                # Start of (Monday-based) week
+                bucket = func.date(SensorReading.timestamp, 'weekday 0', '-6 days')
+            else:  # month
+                bucket = func.strftime('%Y-%m', SensorReading.timestamp)
+
+        bucket = bucket.label('bucket')
+
+        rows = db.session.query(
+            bucket,
+            func.avg(SensorReading.vibration),
+            func.avg(SensorReading.strain),
+            func.avg(SensorReading.temperature)
+        ).filter(
             SensorReading.timestamp >= start_date,
-            SensorReading.timestamp <= end_date
-        ).order_by(SensorReading.timestamp.asc()).all()
-        
-        if not readings:
+            SensorReading.timestamp < end_date
+        ).group_by(bucket).order_by(bucket).all()
+
+        if not rows:
             return jsonify({
                 'labels': [],
                 'datasets': []
             })
-        
-        # Group by time period
-        from collections import defaultdict
-        
-        grouped_data = defaultdict(list)
-        
-        for reading in readings:
-            if period == 'hour':
-                key = reading.timestamp.strftime('%Y-%m-%d %H:00')
-            elif period == 'day':
-                key = reading.timestamp.strftime('%Y-%m-%d')
-            elif period == 'week':
-                # Get start of week
-                start_of_week = reading.timestamp - timedelta(days=reading.timestamp.weekday())
-                key = start_of_week.strftime('%Y-%m-%d')
-            else:  # month
-                key = reading.timestamp.strftime('%Y-%m')
-            
-            grouped_data[key].append(reading)
-        
-        # Calculate averages for each group
+
+        # Format bucket keys only for the final JSON labels
+        label_formats = {'hour': '%Y-%m-%d %H:00', 'day': '%Y-%m-%d',
+                         'week': '%Y-%m-%d'}
+        label_format = label_formats.get(period, '%Y-%m')
+
         labels = []
         vibration_data = []
         strain_data = []
         temperature_data = []
-        
-        for key in sorted(grouped_data.keys()):
-            readings_group = grouped_data[key]
-            
-            avg_vibration = sum(r.vibration for r in readings_group) / len(readings_group)
-            avg_strain = sum(r.strain for r in readings_group) / len(readings_group)
-            avg_temperature = sum(r.temperature for r in readings_group) / len(readings_group)
-            
-            labels.append(key)
+
+        # Bucket type is uniform per dialect (datetime on PostgreSQL,
+        # string on SQLite), so pick the formatter once outside the loop
+        if rows and isinstance(rows[0][0], datetime):
+            format_label = lambda value: value.strftime(label_format)
+        else:
+            format_label = str
+
+        for bucket_value, avg_vibration, avg_strain, avg_temperature in rows:
+            labels.append(format_label(bucket_value))
             vibration_data.append(round(avg_vibration, 2))
             strain_data.append(round(avg_strain, 3))
             temperature_data.append(round(avg_temperature, 1))
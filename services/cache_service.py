@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+import orjson
+from flask import request, Response, current_app
+
+logger = logging.getLogger(__name__)
+
+class CacheService:
+    """Service for caching JSON responses in Redis"""
+
+    _pool = None
+
+    @classmethod
+    def get_client(cls):
+        """Get a pooled Redis client, or None if Redis is not configured"""
+        redis_url = current_app.config.get('REDIS_URL')
+        if not redis_url:
+            return None
+
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed, response caching disabled")
+            return None
+
+        try:
+            if cls._pool is None:
+                cls._pool = redis.ConnectionPool.from_url(redis_url)
+            return redis.Redis(connection_pool=cls._pool)
+        except Exception as e:
+            logger.warning(f"Could not connect to Redis: {str(e)}")
+            return None
+
+    @classmethod
+    def publish_invalidation(cls, channel: str, message: str):
+        """Publish a cache invalidation event (no-op without Redis)"""
+        try:
+            client = cls.get_client()
+            if client:
+                client.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"Could not publish cache invalidation: {str(e)}")
+
+def ttl_memoize(ttl_seconds: int = 30, maxsize: int = 128):
+    """In-process TTL memoizer for cheap, frequently repeated lookups
+
+    Results are cached per argument tuple for ttl_seconds, with LRU
+    eviction at maxsize (matching the lru_cache(128) used for parsed
+    filters) so request-controlled argument values cannot grow the cache
+    without bound. Call fn.invalidate() from write paths to drop entries
+    early.
+    """
+    def decorator(fn):
+        state = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = state.get(key)
+                if hit is not None and now - hit[0] < ttl_seconds:
+                    state.move_to_end(key)
+                    return hit[1]
+            value = fn(*args, **kwargs)
+            with lock:
+                state[key] = (now, value)
+                state.move_to_end(key)
+                while len(state) > maxsize:
+                    state.popitem(last=False)
+            return value
+
+        wrapper.invalidate = state.clear
+        return wrapper
+    return decorator
+
+def _rebuild_cached_response(cached: bytes) -> Response:
+    """Rebuild a response from a cached envelope, honoring If-None-Match
+
+    The envelope is one JSON metadata line (validator headers captured at
+    cache-write time) followed by the body, so a warm cache serves the
+    same ETag/Cache-Control the view would have set — and conditional
+    requests still collapse to a 304 instead of silently losing their
+    validators while the cache is hot.
+    """
+    meta_blob, _, body = cached.partition(b'\n')
+    meta = orjson.loads(meta_blob)
+    etag = meta.get('etag')
+
+    if etag and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+
+    if etag:
+        response.set_etag(etag)
+    if meta.get('cache_control'):
+        response.headers['Cache-Control'] = meta['cache_control']
+    return response
+
+def cached_response(prefix: str, ttl: int = None):
+    """Read-through cache decorator for JSON endpoints
+
+    Responses are keyed on the request query string and served from Redis
+    on a hit, headers and body alike; streaming and non-200 responses are
+    never cached. Without a configured Redis the view runs as before.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client = CacheService.get_client()
+            if client is None:
+                return view(*args, **kwargs)
+
+            key = f"{prefix}:{request.query_string.decode('utf-8', 'replace')}"
+
+            try:
+                cached = client.get(key)
+                if cached is not None:
+                    return _rebuild_cached_response(cached)
+            except Exception as e:
+                logger.warning(f"Cache read failed for {key}: {str(e)}")
+                return view(*args, **kwargs)
+
+            response = current_app.make_response(view(*args, **kwargs))
+
+            if response.status_code == 200 and not response.is_streamed:
+                try:
+                    expiry = ttl or current_app.config.get('CACHE_TTL_SECONDS', 10)
+                    envelope = orjson.dumps({
+                        'etag': response.get_etag()[0],
+                        'cache_control': response.headers.get('Cache-Control'),
+                    }) + b'\n' + response.get_data()
+                    client.setex(key, expiry, envelope)
+                except Exception as e:
+                    logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+            return response
+        return wrapper
+    return decorator
@@ -1,6 +1,8 @@
 import logging
 import json
-import pickle
+import os
+import threading
+import joblib
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
@@ -11,6 +13,7 @@ from sklearn.metrics import classification_report
 from __init__ import db
 from models import SensorReading, MLModel
 from config import Config
+from services.cache_service import ttl_memoize
 
 logger = logging.getLogger(__name__)
 
@@ -21,49 +24,159 @@ class MLService:
         self.model = None
         self.scaler = None
         self.model_type = 'IsolationForest'
-        
+        self._onnx_session = None
+        # Scaler statistics as float32 plus a per-thread scratch row, so
+        # single predictions scale in place with zero allocations
+        self._mean = None
+        self._scale = None
+        self._scratch = threading.local()
+
+    def _cache_scaler_stats(self):
+        """Cache the fitted scaler's statistics for the hot predict path
+
+        StandardScaler.transform allocates a fresh float64 array per
+        call; with mean_ and scale_ held as float32 the single-row path
+        can do the same arithmetic in place on a reused buffer.
+        """
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+
+    def _feature_buffer(self) -> np.ndarray:
+        """Reusable (1, 5) float32 row, one per thread"""
+        buf = getattr(self._scratch, 'buf', None)
+        if buf is None:
+            buf = self._scratch.buf = np.empty((1, 5), dtype=np.float32)
+        return buf
+
+    def _build_onnx_session(self):
+        """Compile the fitted model to an ONNX session when available
+
+        onnxruntime traverses the trees in native code over a contiguous
+        float32 batch, which is typically 5-20x faster than sklearn's
+        Python-level ensemble walk. Without skl2onnx/onnxruntime
+        installed the sklearn predictor is used unchanged.
+        """
+        self._onnx_session = None
+        try:
+            import skl2onnx
+            import onnxruntime
+        except ImportError:
+            logger.info("skl2onnx/onnxruntime not installed, using sklearn inference")
+            return
+
+        try:
+            onnx_model = skl2onnx.to_onnx(self.model, np.zeros((1, 5), dtype=np.float32))
+            self._onnx_session = onnxruntime.InferenceSession(
+                onnx_model.SerializeToString(),
+                providers=['CPUExecutionProvider']
+            )
+            logger.info("Compiled anomaly model to ONNX for native inference")
+        except Exception as e:
+            logger.warning(f"Could not compile model to ONNX: {str(e)}")
+
+    def _decision_scores(self, features_scaled) -> np.ndarray:
+        """Anomaly scores for a scaled batch via the fastest predictor
+
+        Routes through the compiled ONNX session when one exists and
+        falls back to sklearn's decision_function otherwise; negative
+        scores mean anomalous in both cases.
+        """
+        if self._onnx_session is not None:
+            inputs = {
+                self._onnx_session.get_inputs()[0].name:
+                    np.asarray(features_scaled, dtype=np.float32)
+            }
+            # Output order is (label, scores) for outlier-detector models
+            return self._onnx_session.run(None, inputs)[1].ravel()
+        return self.model.decision_function(features_scaled)
+
+    def _persist_model(self, model_name: str) -> Optional[str]:
+        """Dump the fitted (scaler, model) pair to disk
+
+        The artifact is written uncompressed so loads can use mmap: the
+        tree arrays stay in the page cache and every worker shares one
+        physical copy instead of retraining independently.
+        """
+        try:
+            os.makedirs(Config.ML_MODEL_DIR, exist_ok=True)
+            path = os.path.join(Config.ML_MODEL_DIR, f"{model_name}.joblib")
+            joblib.dump((self.scaler, self.model), path)
+            return path
+        except Exception as e:
+            logger.warning(f"Could not persist model {model_name}: {str(e)}")
+            return None
+
+    def _load_persisted_model(self) -> bool:
+        """Load the latest persisted model instead of retraining
+
+        Called lazily on the first prediction after a worker start; a
+        several-hundred-ms training run collapses to one mmap load.
+        """
+        try:
+            latest_model = MLModel.query.filter(
+                MLModel.model_type == self.model_type,
+                MLModel.is_active == True,
+                MLModel.model_path.isnot(None)
+            ).order_by(MLModel.created_at.desc()).first()
+
+            if not latest_model or not os.path.exists(latest_model.model_path):
+                return False
+
+            self.scaler, self.model = joblib.load(latest_model.model_path, mmap_mode='r')
+            self._cache_scaler_stats()
+            self._build_onnx_session()
+            logger.info(f"Loaded persisted model from {latest_model.model_path}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not load persisted model: {str(e)}")
+            return False
+
     def prepare_training_data(self, readings: List[SensorReading]) -> Tuple[np.ndarray, List[int]]:
-        """Prepare data for training"""
+        """Prepare data for training
+
+        Fills one float32 array straight from the readings via np.fromiter
+        rather than growing a list of lists and re-boxing every value in
+        np.array; float32 also halves the memory bandwidth into sklearn.
+        """
         if not readings:
             return np.array([]), []
-            
-        # Extract features
-        features = []
-        reading_ids = []
-        
-        for reading in readings:
-            features.append([
-                reading.vibration,
-                reading.strain,
-                reading.temperature,
-                reading.timestamp.hour,  # Time of day feature
-                reading.timestamp.weekday()  # Day of week feature
-            ])
-            reading_ids.append(reading.id)
-        
-        return np.array(features), reading_ids
+
+        def feature_values():
+            for reading in readings:
+                yield reading.vibration
+                yield reading.strain
+                yield reading.temperature
+                yield reading.timestamp.hour  # Time of day feature
+                yield reading.timestamp.weekday()  # Day of week feature
+
+        features = np.fromiter(
+            feature_values(), dtype=np.float32, count=len(readings) * 5
+        ).reshape(-1, 5)
+        reading_ids = [reading.id for reading in readings]
+
+        return features, reading_ids
     
     def train_isolation_forest(self, contamination: float = 0.1) -> Dict:
         """Train Isolation Forest model"""
         try:
-            # Get training data
+            # Get training data as a contiguous float32 matrix straight
+            # from the DB cursor, skipping ORM instance construction
             cutoff_date = datetime.utcnow() - timedelta(days=7)
-            readings = SensorReading.query.filter(
-                SensorReading.timestamp >= cutoff_date
-            ).order_by(SensorReading.timestamp.desc()).limit(
-                Config.ML_TRAINING_DATA_SIZE
-            ).all()
-            
-            if len(readings) < 50:
+            features = SensorReading.get_training_matrix(
+                limit=Config.ML_TRAINING_DATA_SIZE,
+                since=cutoff_date
+            )
+
+            if features.shape[0] < 50:
                 logger.warning("Insufficient data for training")
                 return {"error": "Insufficient training data"}
-            
-            features, reading_ids = self.prepare_training_data(readings)
-            
+
             # Scale features
             self.scaler = StandardScaler()
             features_scaled = self.scaler.fit_transform(features)
-            
+            self._cache_scaler_stats()
+
             # Train model
             self.model = IsolationForest(
                 contamination=contamination,
@@ -71,32 +184,34 @@ class MLService:
                 n_estimators=100
             )
             self.model.fit(features_scaled)
-            
-            # Make predictions on training data
-            predictions = self.model.predict(features_scaled)
+            self._build_onnx_session()
+
+            # Score the training data once; negative scores are anomalies
             anomaly_scores = self.model.decision_function(features_scaled)
-            
-            # Save model metadata
+
+            # Persist the fitted artifact and save metadata pointing at it
+            model_name = f"isolation_forest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
             model_record = MLModel(
-                model_name=f"isolation_forest_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                model_name=model_name,
                 model_type='IsolationForest',
-                training_data_size=len(readings),
+                training_data_size=features.shape[0],
                 model_params=json.dumps({
                     'contamination': contamination,
                     'n_estimators': 100,
                     'random_state': 42
-                })
+                }),
+                model_path=self._persist_model(model_name)
             )
             
             db.session.add(model_record)
             db.session.commit()
             
-            logger.info(f"Trained Isolation Forest with {len(readings)} samples")
+            logger.info(f"Trained Isolation Forest with {features.shape[0]} samples")
             
             return {
                 "model_type": "IsolationForest",
-                "training_samples": len(readings),
-                "anomalies_detected": sum(1 for p in predictions if p == -1),
+                "training_samples": int(features.shape[0]),
+                "anomalies_detected": int((anomaly_scores < 0).sum()),
                 "model_id": model_record.id
             }
             
@@ -108,24 +223,23 @@ class MLService:
     def train_one_class_svm(self, nu: float = 0.1) -> Dict:
         """Train One-Class SVM model"""
         try:
-            # Get training data
+            # Same cursor-built float32 matrix as the Isolation Forest
+            # path: no ORM instances, one contiguous allocation
             cutoff_date = datetime.utcnow() - timedelta(days=7)
-            readings = SensorReading.query.filter(
-                SensorReading.timestamp >= cutoff_date
-            ).order_by(SensorReading.timestamp.desc()).limit(
-                Config.ML_TRAINING_DATA_SIZE
-            ).all()
-            
-            if len(readings) < 50:
+            features = SensorReading.get_training_matrix(
+                limit=Config.ML_TRAINING_DATA_SIZE,
+                since=cutoff_date
+            )
+
+            if features.shape[0] < 50:
                 logger.warning("Insufficient data for training")
                 return {"error": "Insufficient training data"}
-            
-            features, reading_ids = self.prepare_training_data(readings)
-            
+
             # Scale features
             self.scaler = StandardScaler()
             features_scaled = self.scaler.fit_transform(features)
-            
+            self._cache_scaler_stats()
+
             # Train model
             self.model = OneClassSVM(
                 nu=nu,
@@ -133,32 +247,34 @@ class MLService:
                 gamma='scale'
             )
             self.model.fit(features_scaled)
-            
-            # Make predictions on training data
-            predictions = self.model.predict(features_scaled)
+            self._build_onnx_session()
+
+            # Score the training data once; negative scores are anomalies
             anomaly_scores = self.model.decision_function(features_scaled)
-            
-            # Save model metadata
+
+            # Persist the fitted artifact and save metadata pointing at it
+            model_name = f"one_class_svm_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
             model_record = MLModel(
-                model_name=f"one_class_svm_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                model_name=model_name,
                 model_type='OneClassSVM',
-                training_data_size=len(readings),
+                training_data_size=features.shape[0],
                 model_params=json.dumps({
                     'nu': nu,
                     'kernel': 'rbf',
                     'gamma': 'scale'
-                })
+                }),
+                model_path=self._persist_model(model_name)
             )
             
             db.session.add(model_record)
             db.session.commit()
             
-            logger.info(f"Trained One-Class SVM with {len(readings)} samples")
+            logger.info(f"Trained One-Class SVM with {features.shape[0]} samples")
             
             return {
                 "model_type": "OneClassSVM",
-                "training_samples": len(readings),
-                "anomalies_detected": sum(1 for p in predictions if p == -1),
+                "training_samples": int(features.shape[0]),
+                "anomalies_detected": int((anomaly_scores < 0).sum()),
                 "model_id": model_record.id
             }
             
@@ -170,37 +286,98 @@ class MLService:
     def predict_anomaly(self, reading: SensorReading) -> Tuple[bool, float]:
         """Predict if reading is anomalous"""
         if not self.model or not self.scaler:
-            # Try to train model if not available
-            result = self.train_isolation_forest()
-            if "error" in result:
-                logger.warning("Could not train model for prediction")
-                return False, 0.0
+            # Prefer loading the persisted model; retraining is the cold
+            # fallback when no artifact exists yet
+            if not self._load_persisted_model():
+                result = self.train_isolation_forest()
+                if "error" in result:
+                    logger.warning("Could not train model for prediction")
+                    return False, 0.0
         
         try:
-            # Prepare features
-            features = np.array([[
+            if self._mean is None:
+                self._cache_scaler_stats()
+
+            # Write the features into the per-thread scratch row and
+            # scale in place: no per-prediction allocations, and float32
+            # halves the bandwidth into the predictor
+            features_scaled = self._feature_buffer()
+            features_scaled[0, 0] = reading.vibration
+            features_scaled[0, 1] = reading.strain
+            features_scaled[0, 2] = reading.temperature
+            features_scaled[0, 3] = reading.timestamp.hour
+            features_scaled[0, 4] = reading.timestamp.weekday()
+            np.subtract(features_scaled, self._mean, out=features_scaled)
+            np.divide(features_scaled, self._scale, out=features_scaled)
+
+            # One forest walk: predict() and decision_function() each
+            # traverse every tree, and the label is just the score's sign
+            score = float(self._decision_scores(features_scaled)[0])
+            is_anomaly = score < 0
+
+            return is_anomaly, score
+            
+        except Exception as e:
+            logger.error(f"Error predicting anomaly: {str(e)}")
+            return False, 0.0
+    
+    def predict_anomaly_batch(self, readings: List[SensorReading]) -> List[Tuple[bool, float]]:
+        """Predict anomalies for a batch of readings in one dispatch
+
+        Stacks the features into a single (n, 5) float32 matrix so
+        scaler.transform and the forest walk each run once per batch
+        instead of once per reading — the fixed Python-to-C call overhead
+        is amortized across the whole batch.
+        """
+        if not readings:
+            return []
+
+        if not self.model or not self.scaler:
+            if not self._load_persisted_model():
+                result = self.train_isolation_forest()
+                if "error" in result:
+                    logger.warning("Could not train model for prediction")
+                    return [(False, 0.0)] * len(readings)
+
+        try:
+            features = np.asarray([[
                 reading.vibration,
                 reading.strain,
                 reading.temperature,
                 reading.timestamp.hour,
                 reading.timestamp.weekday()
-            ]])
-            
-            # Scale features
+            ] for reading in readings], dtype=np.float32)
+
             features_scaled = self.scaler.transform(features)
-            
-            # Make prediction
-            prediction = self.model.predict(features_scaled)[0]
-            score = self.model.decision_function(features_scaled)[0]
-            
-            is_anomaly = prediction == -1
-            
-            return is_anomaly, float(score)
-            
+            scores = self._decision_scores(features_scaled)
+
+            return [(bool(score < 0), float(score)) for score in scores]
+
         except Exception as e:
-            logger.error(f"Error predicting anomaly: {str(e)}")
-            return False, 0.0
-    
+            logger.error(f"Error predicting anomaly batch: {str(e)}")
+            return [(False, 0.0)] * len(readings)
+
+    def update_readings_with_predictions(self, readings: List[SensorReading]) -> List[SensorReading]:
+        """Update a batch of readings with ML predictions in one commit"""
+        try:
+            predictions = self.predict_anomaly_batch(readings)
+
+            for reading, (is_anomaly, score) in zip(readings, predictions):
+                reading.is_anomaly = is_anomaly
+                reading.anomaly_score = score
+
+            db.session.commit()
+            SensorReading.bump_data_version()
+
+            logger.info(f"Updated {len(readings)} readings with anomaly predictions")
+
+            return readings
+
+        except Exception as e:
+            logger.error(f"Error updating readings with predictions: {str(e)}")
+            db.session.rollback()
+            return readings
+
     def update_reading_with_prediction(self, reading: SensorReading) -> SensorReading:
         """Update reading with ML prediction"""
         try:
@@ -210,7 +387,8 @@ class MLService:
             reading.anomaly_score = score
             
             db.session.commit()
-            
+            SensorReading.bump_data_version()
+
             logger.info(f"Updated reading {reading.id} with anomaly prediction: {is_anomaly}")
             
             return reading
@@ -220,6 +398,7 @@ class MLService:
             db.session.rollback()
             return reading
     
+    @ttl_memoize(30)
     def get_model_info(self) -> Dict:
         """Get information about current model"""
         if not self.model:
@@ -262,7 +441,12 @@ class MLService:
                 db.session.commit()
                 
                 return self.train_isolation_forest()
-            
+
+            # Model is fresh; make sure this worker has it mapped rather
+            # than leaving the load to the first prediction
+            if not self.model:
+                self._load_persisted_model()
+
             return {"message": "Model is up to date"}
             
         except Exception as e:
@@ -2,12 +2,27 @@ import random
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import case, func
 from __init__ import db
 from models import SensorReading
 from config import Config
+from services.cache_service import ttl_memoize
 
 logger = logging.getLogger(__name__)
 
+# Threshold table frozen at import time: (key, display name, warning,
+# critical) tuples save the per-reading dict iteration, nested limit
+# lookups and .title() calls in the hot check path
+_THRESHOLDS = tuple(
+    (name, name.title(), limits['warning'], limits['critical'])
+    for name, limits in Config.ALERT_THRESHOLDS.items()
+)
+
+# Shared generator for batch simulation; NumPy's Generator fills whole
+# noise arrays in one call instead of one random.uniform per value
+_rng = np.random.default_rng()
+
 class SensorService:
     """Service for handling sensor data operations"""
     
@@ -36,21 +51,69 @@ class SensorService:
             'strain': strain,
             'temperature': temperature
         }
-    
+
+    @staticmethod
+    def generate_sensor_data_batch(n: int) -> List[Dict]:
+        """Generate n readings at once with vectorized noise
+
+        Follows the same daily-pattern model as generate_sensor_data but
+        draws every noise array in one Generator call, so simulation and
+        load-test streams pay NumPy array arithmetic instead of three
+        Python random calls per reading. The records are shaped for
+        SensorReading.bulk_insert.
+        """
+        current_time = datetime.utcnow()
+        hour = current_time.hour
+
+        temp_base = 25 + 10 * abs(hour - 12) / 12
+        temperatures = np.round(temp_base + _rng.uniform(-5, 5, n), 1)
+
+        vibration_base = 0.5 + (temperatures - 20) * 0.05
+        vibrations = np.round(
+            np.maximum(0.1, vibration_base + _rng.uniform(-0.5, 1.5, n)), 2
+        )
+
+        strains = np.round(_rng.uniform(0.0, 0.8, n), 3)
+
+        return [
+            {
+                'timestamp': current_time,
+                'vibration': vibration,
+                'strain': strain,
+                'temperature': temperature
+            }
+            for vibration, strain, temperature in zip(
+                vibrations.tolist(), strains.tolist(), temperatures.tolist()
+            )
+        ]
+
     @staticmethod
-    def save_reading(sensor_data: Dict) -> SensorReading:
-        """Save sensor reading to database"""
+    def save_reading(sensor_data: Dict, alert_level: str = 'normal') -> SensorReading:
+        """Save sensor reading to database
+
+        The alert level is resolved from the raw values before the row is
+        written, so the INSERT persists it directly instead of a separate
+        UPDATE + COMMIT after the fact.
+        """
         try:
             reading = SensorReading(
                 timestamp=sensor_data['timestamp'],
                 vibration=sensor_data['vibration'],
                 strain=sensor_data['strain'],
-                temperature=sensor_data['temperature']
+                temperature=sensor_data['temperature'],
+                alert_level=alert_level
             )
-            
+
             db.session.add(reading)
             db.session.commit()
-            
+
+            # Let cache subscribers know fresh data is available and drop
+            # the memoized statistics
+            from services.cache_service import CacheService
+            CacheService.publish_invalidation('shm:readings', str(reading.id))
+            SensorService.get_statistics.invalidate()
+            SensorReading.bump_data_version()
+
             logger.info(f"Saved sensor reading: {reading.id}")
             return reading
             
@@ -58,41 +121,123 @@ class SensorService:
             logger.error(f"Error saving sensor reading: {str(e)}")
             db.session.rollback()
             raise
-    
+
+    @staticmethod
+    def save_readings(batch: List[Dict]) -> int:
+        """Save a batch of sensor readings in one bulk INSERT
+
+        Alert levels are resolved for the whole batch with the vectorized
+        checker before the write, then every row goes through
+        SensorReading.bulk_insert — a single executemany (COPY on
+        PostgreSQL) and one commit instead of an INSERT + fsync per tick.
+        """
+        if not batch:
+            return 0
+
+        try:
+            levels = SensorService.check_threshold_levels({
+                'vibration': [record['vibration'] for record in batch],
+                'strain': [record['strain'] for record in batch],
+                'temperature': [record['temperature'] for record in batch]
+            })
+            for record, level in zip(batch, levels):
+                record['alert_level'] = level
+
+            SensorReading.bulk_insert(batch)
+
+            from services.cache_service import CacheService
+            CacheService.publish_invalidation('shm:readings', f'batch:{len(batch)}')
+            SensorService.get_statistics.invalidate()
+            SensorReading.bump_data_version()
+
+            logger.info(f"Saved {len(batch)} sensor readings")
+            return len(batch)
+
+        except Exception as e:
+            logger.error(f"Error saving sensor reading batch: {str(e)}")
+            db.session.rollback()
+            raise
+
     @staticmethod
-    def get_readings(limit: int = 20) -> List[SensorReading]:
+    def get_readings(limit: int = 20, anomalies_only: bool = False) -> List[SensorReading]:
         """Get recent sensor readings"""
         try:
-            return SensorReading.query.order_by(
+            query = SensorReading.query
+            if anomalies_only:
+                query = query.filter(SensorReading.is_anomaly == True)
+            return query.order_by(
                 SensorReading.timestamp.desc()
             ).limit(limit).all()
         except Exception as e:
             logger.error(f"Error fetching readings: {str(e)}")
             return []
-    
+
     @staticmethod
-    def get_readings_by_date_range(start_date: datetime, end_date: datetime) -> List[SensorReading]:
-        """Get readings within date range"""
+    def get_readings_data(limit: int = 20, anomalies_only: bool = False) -> List[Dict]:
+        """Get recent readings as dictionaries without ORM instances"""
         try:
-            return SensorReading.query.filter(
-                SensorReading.timestamp >= start_date,
-                SensorReading.timestamp <= end_date
-            ).order_by(SensorReading.timestamp.desc()).all()
+            rows = SensorReading.get_latest_rows(limit=limit, anomalies_only=anomalies_only)
+            return SensorReading.rows_to_dicts(rows)
+        except Exception as e:
+            logger.error(f"Error fetching reading rows: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_readings_by_date_range(start_date: datetime, end_date: datetime,
+                                   before_timestamp: Optional[datetime] = None,
+                                   before_id: Optional[int] = None,
+                                   limit: int = 50,
+                                   anomalies_only: bool = False) -> List[SensorReading]:
+        """Get readings within date range with keyset pagination"""
+        try:
+            return SensorReading.get_by_date_range(
+                start_date, end_date,
+                before_timestamp=before_timestamp,
+                before_id=before_id,
+                limit=limit,
+                anomalies_only=anomalies_only
+            )
         except Exception as e:
             logger.error(f"Error fetching readings by date range: {str(e)}")
             return []
+
+    @staticmethod
+    def stream_readings_by_date_range(start_date: datetime, end_date: datetime,
+                                      before_timestamp: Optional[datetime] = None,
+                                      before_id: Optional[int] = None,
+                                      limit: Optional[int] = None,
+                                      anomalies_only: bool = False):
+        """Stream readings within date range in batches"""
+        return SensorReading.stream_by_date_range(
+            start_date, end_date,
+            before_timestamp=before_timestamp,
+            before_id=before_id,
+            limit=limit,
+            anomalies_only=anomalies_only
+        )
     
     @staticmethod
+    @ttl_memoize(30)
     def get_statistics() -> Dict:
         """Get basic statistics about sensor data"""
         try:
-            # Get readings from last 24 hours
+            # One composite aggregate over the last 24 hours: a single
+            # roundtrip and table scan instead of materializing every
+            # reading just to sum it in Python
             yesterday = datetime.utcnow() - timedelta(days=1)
-            readings = SensorReading.query.filter(
+            row = db.session.query(
+                func.count(),
+                func.sum(case((SensorReading.is_anomaly == True, 1), else_=0)),
+                func.sum(case((SensorReading.alert_level != 'normal', 1), else_=0)),
+                func.avg(SensorReading.temperature),
+                func.avg(SensorReading.vibration),
+                func.avg(SensorReading.strain)
+            ).filter(
                 SensorReading.timestamp >= yesterday
-            ).all()
-            
-            if not readings:
+            ).one()
+
+            total_readings = row[0] or 0
+            if not total_readings:
                 return {
                     'total_readings': 0,
                     'anomalies': 0,
@@ -101,25 +246,16 @@ class SensorService:
                     'avg_vibration': 0,
                     'avg_strain': 0
                 }
-            
-            # Calculate statistics
-            total_readings = len(readings)
-            anomalies = sum(1 for r in readings if r.is_anomaly)
-            alerts = sum(1 for r in readings if r.alert_level != 'normal')
-            
-            avg_temperature = sum(r.temperature for r in readings) / total_readings
-            avg_vibration = sum(r.vibration for r in readings) / total_readings
-            avg_strain = sum(r.strain for r in readings) / total_readings
-            
+
             return {
                 'total_readings': total_readings,
-                'anomalies': anomalies,
-                'alerts': alerts,
-                'avg_temperature': round(avg_temperature, 1),
-                'avg_vibration': round(avg_vibration, 2),
-                'avg_strain': round(avg_strain, 3)
+                'anomalies': int(row[1] or 0),
+                'alerts': int(row[2] or 0),
+                'avg_temperature': round(row[3], 1),
+                'avg_vibration': round(row[4], 2),
+                'avg_strain': round(row[5], 3)
             }
-            
+
         except Exception as e:
             logger.error(f"Error calculating statistics: {str(e)}")
             return {
@@ -132,21 +268,54 @@ class SensorService:
             }
     
     @staticmethod
-    def check_thresholds(reading: SensorReading) -> Tuple[str, List[str]]:
-        """Check if reading exceeds thresholds"""
-        thresholds = Config.ALERT_THRESHOLDS
+    def check_threshold_values(values: Dict) -> Tuple[str, List[str]]:
+        """Check raw sensor values against the configured thresholds
+
+        Works on a plain dict so the level can be resolved before an ORM
+        row exists and written with the initial INSERT.
+        """
         alert_level = 'normal'
         messages = []
-        
-        # Check each sensor type
-        for sensor_type, limits in thresholds.items():
-            value = getattr(reading, sensor_type)
-            
-            if value >= limits['critical']:
+
+        # Check each sensor type against the precompiled threshold table
+        for sensor_type, display_name, warning, critical in _THRESHOLDS:
+            value = values[sensor_type]
+
+            if value >= critical:
                 alert_level = 'critical'
-                messages.append(f"{sensor_type.title()} critical: {value} >= {limits['critical']}")
-            elif value >= limits['warning'] and alert_level != 'critical':
+                messages.append(f"{display_name} critical: {value} >= {critical}")
+            elif value >= warning and alert_level != 'critical':
                 alert_level = 'warning'
-                messages.append(f"{sensor_type.title()} warning: {value} >= {limits['warning']}")
-        
-        return alert_level, messages
\ No newline at end of file
+                messages.append(f"{display_name} warning: {value} >= {warning}")
+
+        return alert_level, messages
+
+    @staticmethod
+    def check_threshold_levels(columns: Dict) -> List[str]:
+        """Resolve alert levels for whole columns of sensor values
+
+        Takes a dict of per-sensor value arrays (as produced by the batch
+        generator) and compares each column against its thresholds with
+        NumPy, so the per-reading Python loop disappears for bulk ingest.
+        """
+        n = len(next(iter(columns.values())))
+        critical_mask = np.zeros(n, dtype=bool)
+        warning_mask = np.zeros(n, dtype=bool)
+
+        for sensor_type, _display_name, warning, critical in _THRESHOLDS:
+            values = np.asarray(columns[sensor_type])
+            critical_mask |= values >= critical
+            warning_mask |= values >= warning
+
+        levels = np.where(critical_mask, 'critical',
+                          np.where(warning_mask, 'warning', 'normal'))
+        return levels.tolist()
+
+    @staticmethod
+    def check_thresholds(reading: SensorReading) -> Tuple[str, List[str]]:
+        """Check if reading exceeds thresholds"""
+        return SensorService.check_threshold_values({
+            'vibration': reading.vibration,
+            'strain': reading.strain,
+            'temperature': reading.temperature
+        })
\ No newline at end of file